@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Diagram Table Compiler
+
+This script compiles the diagram tables in diagram_specs.py into diagrams.json, the
+dataset generate_diagram.py renders from. The specs are read with ast and evaluated
+as literals, never imported, so compiling needs nothing beyond the standard library.
+
+generate_diagram.py runs the compiler itself whenever diagram_specs.py has changed;
+it only needs to be run by hand to inspect the compiled output.
+
+Usage:
+python compile_diagrams.py
+"""
+
+import ast
+import hashlib
+import json
+import os
+
+SPECS_FILE = "diagram_specs.py"
+COMPILED_FILE = "diagrams.json"
+
+# Arguments of Cluster(...), as declared in diagram_specs.py
+CLUSTER_FIELDS = ("label", "body")
+
+
+def evaluate(node, assigns, filename):
+    """Evaluate a literal expression, resolving names and Cluster(...) calls.
+
+    Clusters become {"cluster": label, "body": [...]} objects; tuples become lists.
+    """
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [evaluate(item, assigns, filename) for item in node.elts]
+    if isinstance(node, ast.Dict):
+        return {
+            evaluate(key, assigns, filename): evaluate(value, assigns, filename)
+            for key, value in zip(node.keys, node.values)
+        }
+    if isinstance(node, ast.Name) and node.id in assigns:
+        return evaluate(assigns[node.id], assigns, filename)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "Cluster":
+        # Cluster(label, body), with either argument passable by keyword
+        args = dict(zip(CLUSTER_FIELDS, node.args))
+        for keyword in node.keywords:
+            if keyword.arg not in CLUSTER_FIELDS or keyword.arg in args:
+                break
+            args[keyword.arg] = keyword.value
+        else:
+            if len(node.args) <= len(CLUSTER_FIELDS) and len(args) == len(CLUSTER_FIELDS):
+                return {
+                    "cluster": evaluate(args["label"], assigns, filename),
+                    "body": evaluate(args["body"], assigns, filename),
+                }
+        raise ValueError(f"{filename}:{node.lineno}: Cluster takes a label and a body: {ast.unparse(node)}")
+    raise ValueError(f"{filename}:{node.lineno}: not a literal diagram expression: {ast.unparse(node)}")
+
+
+def compile_specs(path):
+    """Compile the DIAGRAMS table of a specs file into the diagrams.json structure.
+
+    Edge rows are flattened to [src, dst, label, color, style]. The SHA-1 of the
+    specs and of this compiler are recorded, so a change to either is detected.
+    """
+    with open(path, "rb") as f:
+        source = f.read()
+    assigns = {
+        statement.targets[0].id: statement.value
+        for statement in ast.parse(source, path).body
+        if isinstance(statement, ast.Assign) and isinstance(statement.targets[0], ast.Name)
+    }
+    if "DIAGRAMS" not in assigns:
+        raise ValueError(f"{path}: no DIAGRAMS table")
+
+    diagrams = []
+    for name, spec in evaluate(assigns["DIAGRAMS"], assigns, path):
+        spec["edges"] = [[src, dst, label, *style] for src, dst, label, style in spec["edges"]]
+        diagrams.append({"name": name, **spec})
+    with open(__file__, "rb") as f:
+        compiler_sha1 = hashlib.sha1(f.read()).hexdigest()
+    return {
+        "specs_sha1": hashlib.sha1(source).hexdigest(),
+        "compiler_sha1": compiler_sha1,
+        "diagrams": diagrams,
+    }
+
+
+def compile_to_json(specs_path=SPECS_FILE, compiled_path=COMPILED_FILE):
+    """Compile specs_path and write the result to compiled_path; returns the compiled data."""
+    compiled = compile_specs(specs_path)
+    with open(compiled_path, "w") as f:
+        json.dump(compiled, f, indent=2)
+        f.write("\n")
+    return compiled
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    compile_to_json()
+    print(f"Compiled {SPECS_FILE} into {COMPILED_FILE}")
@@ -0,0 +1,223 @@
+"""
+Diagram definitions for generate_diagram.py.
+
+Each diagram is a table of (nodeid, kind, label) nodes, nested in Cluster(label, body)
+entries, and (src, dst, label, style) edges. This module is never imported by the
+generator: compile_diagrams.py reads it with ast and writes the tables to diagrams.json,
+so everything in it must be a plain literal, a Cluster(...) call or a name bound to one.
+"""
+
+from collections import namedtuple
+
+Cluster = namedtuple("Cluster", "label body")
+
+# Shared edge styles as (color, style); an empty string leaves the attribute unset
+PLAIN = ("", "")
+BLUE = ("blue", "")
+BLUE_BOLD = ("blue", "bold")
+GREEN = ("green", "")
+GREEN_BOLD = ("green", "bold")
+ORANGE = ("orange", "")
+ORANGE_BOLD = ("orange", "bold")
+RED = ("red", "")
+GRAY_DASHED = ("gray", "dashed")
+
+
+# Complete architecture diagram
+COMPLETE_ARCHITECTURE = {
+    "title": "Amazon Q Business Shopify Plugin - Complete Architecture",
+    "direction": "TB",
+    "nodes": [
+        # External components at top
+        ("amazon_q", "AmazonQ", "Amazon Q Business\nClient"),
+
+        Cluster("AWS Cloud Infrastructure", [
+            # API Gateway
+            ("api", "APIGateway", "API Gateway\n(REST API)\n- /oauth/authorize\n- /oauth/token\n- /products\n- /orders\n- /customers\n- /inventory\n- /locations"),
+
+            Cluster("Authentication & Authorization Layer", [
+                # OAuth Lambda
+                ("oauth_lambda", "Lambda", "OAuth Handler\nLambda\n(/oauth/*)"),
+
+                # Token Authorizer Lambda
+                ("authorizer_lambda", "Lambda", "Token Authorizer\nLambda\n(Bearer Token\nValidation)"),
+
+                # OAuth Credentials Secret
+                ("auth_secrets", "SecretsManager", "OAuth Credentials\nSecret\n(client_id, client_secret,\nredirect_uri)"),
+
+                # DynamoDB for auth codes
+                ("auth_codes_table", "DynamodbTable", "OAuth Authorization\nCodes Table\n(TTL enabled)"),
+            ]),
+
+            Cluster("Core Application Layer", [
+                # Main Shopify Plugin Lambda
+                ("main_lambda", "Lambda", "Shopify Plugin\nHandler Lambda\n(All API Operations)"),
+
+                # Shopify API Credentials
+                ("shopify_secrets", "SecretsManager", "Shopify API\nCredentials Secret\n(shop_name, access_token)"),
+            ]),
+
+            Cluster("Monitoring & Logging", [
+                # CloudWatch Logs
+                ("logs", "CloudwatchLogs", "CloudWatch Logs\n(All Lambda logs)"),
+            ]),
+        ]),
+
+        # External Shopify at bottom - closer to core application layer
+        ("shopify", "Shopify", "Shopify Admin API\n(External Service)"),
+    ],
+    "edges": [
+        # OAuth Flow (Steps 1-3)
+        ("amazon_q", "api", "1. OAuth Authorization\nRequest", BLUE_BOLD),
+        ("api", "oauth_lambda", "OAuth Endpoints", BLUE),
+        ("oauth_lambda", "auth_secrets", "Read OAuth\nCredentials", BLUE),
+        ("oauth_lambda", "auth_codes_table", "Store Auth Code\n(with TTL)", BLUE),
+        ("oauth_lambda", "api", "2. Authorization Code\n& Access Token", BLUE_BOLD),
+        ("api", "amazon_q", "3. OAuth Response", BLUE_BOLD),
+
+        # API Request Flow (Steps 4-7)
+        ("amazon_q", "api", "4. API Request\n(Bearer Token)", GREEN_BOLD),
+        ("api", "authorizer_lambda", "5. Token Validation", GREEN),
+        ("authorizer_lambda", "auth_secrets", "Validate Token\nFormat & Credentials", GREEN),
+        ("authorizer_lambda", "api", "6. Allow/Deny\nPolicy", GREEN),
+
+        # Authorized Request Processing (Steps 7-9)
+        ("api", "main_lambda", "7. Authorized Request\n(if token valid)", ORANGE_BOLD),
+        ("main_lambda", "shopify_secrets", "8. Fetch Shopify\nCredentials", ORANGE),
+        ("main_lambda", "shopify", "9. Shopify API\nCalls (REST)", ORANGE_BOLD),
+
+        # Logging connections
+        ("main_lambda", "logs", "Application Logs", GRAY_DASHED),
+        ("oauth_lambda", "logs", "OAuth Logs", GRAY_DASHED),
+        ("authorizer_lambda", "logs", "Auth Logs", GRAY_DASHED),
+    ],
+}
+
+
+# Detailed OAuth flow sequence diagram
+OAUTH_SEQUENCE = {
+    "title": "OAuth 2.0 Authorization Code Flow - Detailed Sequence",
+    "direction": "TB",
+    "nodes": [
+        Cluster("Client Application", [
+            ("qbusiness", "AmazonQ", "Amazon Q Business"),
+        ]),
+
+        Cluster("Authorization Server (AWS API Gateway + Lambda)", [
+            ("auth_endpoint", "APIGateway", "/oauth/authorize\nEndpoint"),
+            ("token_endpoint", "APIGateway", "/oauth/token\nEndpoint"),
+            ("oauth_handler", "Lambda", "OAuth Handler\nLambda"),
+            ("auth_secret", "SecretsManager", "OAuth Credentials\n(client_id, client_secret)"),
+            ("auth_codes_db", "DynamodbTable", "Authorization Codes\nTable (DynamoDB)"),
+        ]),
+
+        Cluster("Resource Server (AWS)", [
+            ("api_gateway", "APIGateway", "Protected API\nEndpoints"),
+            ("authorizer", "Lambda", "Token Authorizer\nLambda"),
+            ("resource_lambda", "Lambda", "Shopify Plugin\nHandler Lambda"),
+        ]),
+    ],
+    "edges": [
+        # OAuth Flow Steps with detailed sequence
+        ("qbusiness", "auth_endpoint", "1. Authorization Request\n(client_id, redirect_uri, state)", BLUE),
+        ("auth_endpoint", "oauth_handler", "", PLAIN),
+        ("oauth_handler", "auth_secret", "", PLAIN),
+        ("oauth_handler", "auth_codes_db", "Generate & Store\nAuth Code", BLUE),
+        ("oauth_handler", "qbusiness", "2. Authorization Code\n(via redirect or direct)", BLUE),
+
+        ("qbusiness", "token_endpoint", "3. Token Request\n(code, client_id, client_secret)", GREEN),
+        ("token_endpoint", "oauth_handler", "", PLAIN),
+        ("oauth_handler", "auth_codes_db", "Validate Auth Code", GREEN),
+        ("oauth_handler", "auth_secret", "", PLAIN),
+        ("oauth_handler", "qbusiness", "4. Access Token\n(Bearer token)", GREEN),
+
+        ("qbusiness", "api_gateway", "5. API Request\n(Bearer token)", ORANGE),
+        ("api_gateway", "authorizer", "", PLAIN),
+        ("authorizer", "auth_secret", "", PLAIN),
+        ("authorizer", "api_gateway", "Allow/Deny Policy", ORANGE),
+        ("api_gateway", "resource_lambda", "6. Protected Resource\nAccess", ORANGE),
+    ],
+}
+
+
+# Detailed API operations diagram
+API_OPERATIONS = {
+    "title": "Shopify Plugin API Operations Overview",
+    "direction": "TB",
+    "nodes": [
+        Cluster("Amazon Q Business Integration", [
+            ("qbusiness_client", "AmazonQ", "Amazon Q Business"),
+        ]),
+
+        Cluster("AWS API Gateway Endpoints", [
+            Cluster("Authentication Endpoints", [
+                ("oauth_auth", "APIGateway", "/oauth/authorize"),
+                ("oauth_token", "APIGateway", "/oauth/token"),
+            ]),
+
+            Cluster("Shopify Data Endpoints", [
+                ("products_api", "APIGateway", "/products\n/products/{id}\n(GET, POST, PUT)"),
+                ("orders_api", "APIGateway", "/orders\n/orders/{id}\n(GET)"),
+                ("customers_api", "APIGateway", "/customers\n/customers/{id}\n(GET)"),
+                ("inventory_api", "APIGateway", "/inventory\n/inventory/{id}\n(GET, PUT)"),
+                ("locations_api", "APIGateway", "/locations\n/locations/{id}\n(GET)"),
+            ]),
+        ]),
+
+        Cluster("AWS Lambda Functions", [
+            ("oauth_lambda", "Lambda", "OAuth Handler"),
+            ("auth_lambda", "Lambda", "Token Authorizer"),
+            ("main_lambda", "Lambda", "Shopify Plugin Handler"),
+        ]),
+
+        Cluster("External Shopify API", [
+            ("shopify_api", "Shopify", "Shopify Admin API\n- Products API\n- Orders API\n- Customers API\n- Inventory API\n- Locations API"),
+        ]),
+
+        Cluster("AWS Storage & Security", [
+            ("secrets", "SecretsManager", "Credentials\nSecrets"),
+            ("dynamo", "DynamodbTable", "Auth Codes\nTable"),
+            ("logs", "CloudwatchLogs", "CloudWatch\nLogs"),
+        ]),
+    ],
+    "edges": [
+        # Client connections to OAuth
+        ("qbusiness_client", "oauth_auth", "OAuth Flow", BLUE),
+        ("qbusiness_client", "oauth_token", "Token Exchange", BLUE),
+
+        # Client connections to API endpoints
+        ("qbusiness_client", "products_api", "Product Queries", GREEN),
+        ("qbusiness_client", "orders_api", "Order Queries", GREEN),
+        ("qbusiness_client", "customers_api", "Customer Queries", GREEN),
+        ("qbusiness_client", "inventory_api", "Inventory Management", GREEN),
+        ("qbusiness_client", "locations_api", "Location Queries", GREEN),
+
+        # Lambda connections
+        ("oauth_auth", "oauth_lambda", "", PLAIN),
+        ("oauth_token", "oauth_lambda", "", PLAIN),
+        ("products_api", "main_lambda", "Authorized", ORANGE),
+        ("orders_api", "main_lambda", "Authorized", ORANGE),
+        ("customers_api", "main_lambda", "Authorized", ORANGE),
+        ("inventory_api", "main_lambda", "Authorized", ORANGE),
+        ("locations_api", "main_lambda", "Authorized", ORANGE),
+
+        # Lambda to Shopify API
+        ("main_lambda", "shopify_api", "REST API Calls", RED),
+
+        # Infrastructure connections
+        ("oauth_lambda", "dynamo", "", PLAIN),
+        ("oauth_lambda", "secrets", "", PLAIN),
+        ("auth_lambda", "secrets", "", PLAIN),
+        ("main_lambda", "secrets", "", PLAIN),
+        ("oauth_lambda", "logs", "", PLAIN),
+        ("auth_lambda", "logs", "", PLAIN),
+        ("main_lambda", "logs", "", PLAIN),
+    ],
+}
+
+
+DIAGRAMS = [
+    ("shopify-plugin-complete-architecture", COMPLETE_ARCHITECTURE),
+    ("oauth-flow-detailed-sequence", OAUTH_SEQUENCE),
+    ("shopify-api-operations", API_OPERATIONS),
+]
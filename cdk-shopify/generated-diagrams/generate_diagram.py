@@ -3,202 +3,321 @@
 Shopify Integration Architecture Diagram Generator
 
 This script generates architecture diagrams for the Shopify integration with Amazon Q Business.
-It uses the diagrams package to create visual representations of the AWS services and their interactions.
+The diagrams are defined as tables in diagram_specs.py, which compile_diagrams.py compiles
+into diagrams.json whenever it changes. This script writes the Graphviz DOT source for each
+compiled diagram, using the AWS icon set shipped with the diagrams package, and renders the
+result with Graphviz.
 
 Requirements:
-- diagrams package: pip install diagrams
+- diagrams package (AWS icons only): pip install diagrams
 - graphviz: https://graphviz.org/download/
 
 Usage:
 python generate_diagram.py
 """
 
-from diagrams import Diagram, Cluster, Edge
-from diagrams.aws.compute import Lambda
-from diagrams.aws.security import SecretsManager
-from diagrams.aws.network import APIGateway
-from diagrams.aws.management import CloudwatchLogs
-from diagrams.aws.database import DynamodbTable as DynamoDB
-from diagrams.custom import Custom
-
-# Generate the complete architecture diagram
-with Diagram(
-    "Amazon Q Business Shopify Plugin - Complete Architecture",
-    show=False,
-    direction="TB",
-    filename="shopify-plugin-complete-architecture",
-    outformat=["png"],
-):
-    # External components at top
-    amazon_q = Custom("Amazon Q Business\nClient", "../assets/amazon-q-icon_gradient_lockup.png")
-    
-    with Cluster("AWS Cloud Infrastructure"):
-        # API Gateway
-        api = APIGateway("API Gateway\n(REST API)\n- /oauth/authorize\n- /oauth/token\n- /products\n- /orders\n- /customers\n- /inventory\n- /locations")
-        
-        with Cluster("Authentication & Authorization Layer"):
-            # OAuth Lambda
-            oauth_lambda = Lambda("OAuth Handler\nLambda\n(/oauth/*)")
-            
-            # Token Authorizer Lambda
-            authorizer_lambda = Lambda("Token Authorizer\nLambda\n(Bearer Token\nValidation)")
-            
-            # OAuth Credentials Secret
-            auth_secrets = SecretsManager("OAuth Credentials\nSecret\n(client_id, client_secret,\nredirect_uri)")
-            
-            # DynamoDB for auth codes
-            auth_codes_table = DynamoDB("OAuth Authorization\nCodes Table\n(TTL enabled)")
-        
-        with Cluster("Core Application Layer"):
-            # Main Shopify Plugin Lambda
-            main_lambda = Lambda("Shopify Plugin\nHandler Lambda\n(All API Operations)")
-            
-            # Shopify API Credentials
-            shopify_secrets = SecretsManager("Shopify API\nCredentials Secret\n(shop_name, access_token)")
-        
-        with Cluster("Monitoring & Logging"):
-            # CloudWatch Logs
-            logs = CloudwatchLogs("CloudWatch Logs\n(All Lambda logs)")
-    
-    # External Shopify at bottom - closer to core application layer
-    shopify = Custom("Shopify Admin API\n(External Service)", "../assets/shopify.png")
-    
-    # OAuth Flow (Steps 1-3)
-    amazon_q >> Edge(label="1. OAuth Authorization\nRequest", color="blue", style="bold") >> api
-    api >> Edge(label="OAuth Endpoints", color="blue") >> oauth_lambda
-    oauth_lambda >> Edge(label="Read OAuth\nCredentials", color="blue") >> auth_secrets
-    oauth_lambda >> Edge(label="Store Auth Code\n(with TTL)", color="blue") >> auth_codes_table
-    oauth_lambda >> Edge(label="2. Authorization Code\n& Access Token", color="blue", style="bold") >> api
-    api >> Edge(label="3. OAuth Response", color="blue", style="bold") >> amazon_q
-    
-    # API Request Flow (Steps 4-7)
-    amazon_q >> Edge(label="4. API Request\n(Bearer Token)", color="green", style="bold") >> api
-    api >> Edge(label="5. Token Validation", color="green") >> authorizer_lambda
-    authorizer_lambda >> Edge(label="Validate Token\nFormat & Credentials", color="green") >> auth_secrets
-    authorizer_lambda >> Edge(label="6. Allow/Deny\nPolicy", color="green") >> api
-    
-    # Authorized Request Processing (Steps 7-9)
-    api >> Edge(label="7. Authorized Request\n(if token valid)", color="orange", style="bold") >> main_lambda
-    main_lambda >> Edge(label="8. Fetch Shopify\nCredentials", color="orange") >> shopify_secrets
-    main_lambda >> Edge(label="9. Shopify API\nCalls (REST)", color="orange", style="bold") >> shopify
-    
-    # Logging connections
-    main_lambda >> Edge(label="Application Logs", color="gray", style="dashed") >> logs
-    oauth_lambda >> Edge(label="OAuth Logs", color="gray", style="dashed") >> logs
-    authorizer_lambda >> Edge(label="Auth Logs", color="gray", style="dashed") >> logs
-
-# Generate a detailed OAuth flow sequence diagram
-with Diagram(
-    "OAuth 2.0 Authorization Code Flow - Detailed Sequence",
-    show=False,
-    direction="TB",
-    filename="oauth-flow-detailed-sequence",
-    outformat=["png"],
-):
-    
-    with Cluster("Client Application"):
-        qbusiness = Custom("Amazon Q Business", "../assets/amazon-q-icon_gradient_lockup.png")
-    
-    with Cluster("Authorization Server (AWS API Gateway + Lambda)"):
-        auth_endpoint = APIGateway("/oauth/authorize\nEndpoint")
-        token_endpoint = APIGateway("/oauth/token\nEndpoint")
-        oauth_handler = Lambda("OAuth Handler\nLambda")
-        auth_secret = SecretsManager("OAuth Credentials\n(client_id, client_secret)")
-        auth_codes_db = DynamoDB("Authorization Codes\nTable (DynamoDB)")
-    
-    with Cluster("Resource Server (AWS)"):
-        api_gateway = APIGateway("Protected API\nEndpoints")
-        authorizer = Lambda("Token Authorizer\nLambda")
-        resource_lambda = Lambda("Shopify Plugin\nHandler Lambda")
-    
-    # OAuth Flow Steps with detailed sequence
-    qbusiness >> Edge(label="1. Authorization Request\n(client_id, redirect_uri, state)", color="blue") >> auth_endpoint
-    auth_endpoint >> oauth_handler
-    oauth_handler >> auth_secret
-    oauth_handler >> Edge(label="Generate & Store\nAuth Code", color="blue") >> auth_codes_db
-    oauth_handler >> Edge(label="2. Authorization Code\n(via redirect or direct)", color="blue") >> qbusiness
-    
-    qbusiness >> Edge(label="3. Token Request\n(code, client_id, client_secret)", color="green") >> token_endpoint
-    token_endpoint >> oauth_handler
-    oauth_handler >> Edge(label="Validate Auth Code", color="green") >> auth_codes_db
-    oauth_handler >> auth_secret
-    oauth_handler >> Edge(label="4. Access Token\n(Bearer token)", color="green") >> qbusiness
-    
-    qbusiness >> Edge(label="5. API Request\n(Bearer token)", color="orange") >> api_gateway
-    api_gateway >> authorizer
-    authorizer >> auth_secret
-    authorizer >> Edge(label="Allow/Deny Policy", color="orange") >> api_gateway
-    api_gateway >> Edge(label="6. Protected Resource\nAccess", color="orange") >> resource_lambda
-
-# Generate a detailed API operations diagram
-with Diagram(
-    "Shopify Plugin API Operations Overview",
-    show=False,
-    direction="TB",
-    filename="shopify-api-operations",
-    outformat=["png"],
-):
-    
-    with Cluster("Amazon Q Business Integration"):
-        qbusiness_client = Custom("Amazon Q Business", "../assets/amazon-q-icon_gradient_lockup.png")
-    
-    with Cluster("AWS API Gateway Endpoints"):
-        with Cluster("Authentication Endpoints"):
-            oauth_auth = APIGateway("/oauth/authorize")
-            oauth_token = APIGateway("/oauth/token")
-        
-        with Cluster("Shopify Data Endpoints"):
-            products_api = APIGateway("/products\n/products/{id}\n(GET, POST, PUT)")
-            orders_api = APIGateway("/orders\n/orders/{id}\n(GET)")
-            customers_api = APIGateway("/customers\n/customers/{id}\n(GET)")
-            inventory_api = APIGateway("/inventory\n/inventory/{id}\n(GET, PUT)")
-            locations_api = APIGateway("/locations\n/locations/{id}\n(GET)")
-    
-    with Cluster("AWS Lambda Functions"):
-        oauth_lambda = Lambda("OAuth Handler")
-        auth_lambda = Lambda("Token Authorizer")
-        main_lambda = Lambda("Shopify Plugin Handler")
-    
-    with Cluster("External Shopify API"):
-        shopify_api = Custom("Shopify Admin API\n- Products API\n- Orders API\n- Customers API\n- Inventory API\n- Locations API", "../assets/shopify.png")
-    
-    with Cluster("AWS Storage & Security"):
-        secrets = SecretsManager("Credentials\nSecrets")
-        dynamo = DynamoDB("Auth Codes\nTable")
-        logs = CloudwatchLogs("CloudWatch\nLogs")
-    
-    # Client connections to OAuth
-    qbusiness_client >> Edge(label="OAuth Flow", color="blue") >> oauth_auth
-    qbusiness_client >> Edge(label="Token Exchange", color="blue") >> oauth_token
-    
-    # Client connections to API endpoints
-    qbusiness_client >> Edge(label="Product Queries", color="green") >> products_api
-    qbusiness_client >> Edge(label="Order Queries", color="green") >> orders_api
-    qbusiness_client >> Edge(label="Customer Queries", color="green") >> customers_api
-    qbusiness_client >> Edge(label="Inventory Management", color="green") >> inventory_api
-    qbusiness_client >> Edge(label="Location Queries", color="green") >> locations_api
-    
-    # Lambda connections
-    oauth_auth >> oauth_lambda
-    oauth_token >> oauth_lambda
-    products_api >> Edge(label="Authorized", color="orange") >> main_lambda
-    orders_api >> Edge(label="Authorized", color="orange") >> main_lambda
-    customers_api >> Edge(label="Authorized", color="orange") >> main_lambda
-    inventory_api >> Edge(label="Authorized", color="orange") >> main_lambda
-    locations_api >> Edge(label="Authorized", color="orange") >> main_lambda
-    
-    # Lambda to Shopify API
-    main_lambda >> Edge(label="REST API Calls", color="red") >> shopify_api
-    
-    # Infrastructure connections
-    oauth_lambda >> dynamo
-    oauth_lambda >> secrets
-    auth_lambda >> secrets
-    main_lambda >> secrets
-    [oauth_lambda, auth_lambda, main_lambda] >> logs
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+# Relative asset and output paths are resolved against the script directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Output formats; dot emits all of them from a single parse of each diagram
+OUTFORMATS = ("png",)
+
+# SHA-1 of the DOT source each diagram was last rendered from, as <name>.sha1
+DOT_CACHE_DIR = ".dotcache"
+
+# Every icon is staged once into ICON_CACHE_DIR under its content hash, so each
+# distinct image is referenced through a single stable path.
+ICON_CACHE_DIR = ".icon-cache"
+
+# Diagram tables and their compiled form; see compile_diagrams.py
+SPECS_FILE = "diagram_specs.py"
+COMPILER_FILE = "compile_diagrams.py"
+COMPILED_FILE = "diagrams.json"
+
+# Custom icons
+AMAZON_Q_ICON = "../assets/amazon-q-icon_gradient_lockup.png"
+SHOPIFY_ICON = "../assets/shopify.png"
+
+# Node kinds and their icons. AWS kinds are named after the diagrams node classes;
+# their icons live under the diagrams package's resources/ directory.
+CUSTOM_ICONS = {
+    "AmazonQ": AMAZON_Q_ICON,
+    "Shopify": SHOPIFY_ICON,
+}
+AWS_ICONS = {
+    "APIGateway": "aws/network/api-gateway.png",
+    "CloudwatchLogs": "aws/management/cloudwatch-logs.png",
+    "DynamodbTable": "aws/database/dynamodb-table.png",
+    "Lambda": "aws/compute/lambda.png",
+    "SecretsManager": "aws/security/secrets-manager.png",
+}
+
+# Graphviz defaults, matching the look of the diagrams package
+GRAPH_ATTRS = {
+    "pad": "2.0",
+    "splines": "ortho",
+    "nodesep": "0.60",
+    "ranksep": "0.75",
+    "fontname": "Sans-Serif",
+    "fontsize": "15",
+    "fontcolor": "#2D3436",
+}
+NODE_ATTRS = {
+    "shape": "box",
+    "style": "rounded",
+    "fixedsize": "true",
+    "width": "1.4",
+    "height": "1.4",
+    "labelloc": "b",
+    "imagescale": "true",
+    "fontname": "Sans-Serif",
+    "fontsize": "13",
+    "fontcolor": "#2D3436",
+}
+EDGE_ATTRS = {
+    "dir": "forward",
+    "fontcolor": "#2D3436",
+    "fontname": "Sans-Serif",
+    "fontsize": "13",
+}
+CLUSTER_ATTRS = {
+    "shape": "box",
+    "style": "rounded",
+    "labeljust": "l",
+    "pencolor": "#AEB6BE",
+    "fontname": "Sans-Serif",
+    "fontsize": "12",
+    "rankdir": "LR",
+}
+# Cluster background colour by nesting depth
+CLUSTER_BGCOLORS = ("#E5F5FD", "#EBF3E7", "#ECE8F6", "#FDF7E3")
+
+
+def file_sha1(path):
+    """SHA-1 of a file's contents."""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_diagrams():
+    """The compiled diagram tables, recompiled first if the specs or compiler changed.
+
+    diagrams.json records the SHA-1 of both diagram_specs.py and the compiler
+    that produced it, so the compiler is only imported and run when either no
+    longer matches. A missing, unreadable or older-format file is recompiled.
+    """
+    compiled = {}
+    if os.path.exists(COMPILED_FILE):
+        with open(COMPILED_FILE) as f:
+            try:
+                compiled = json.load(f)
+            except ValueError:
+                pass
+    if (
+        compiled.get("specs_sha1") != file_sha1(SPECS_FILE)
+        or compiled.get("compiler_sha1") != file_sha1(COMPILER_FILE)
+    ):
+        import compile_diagrams
+
+        compiled = compile_diagrams.compile_to_json(SPECS_FILE, COMPILED_FILE)
+    return compiled["diagrams"]
+
+
+def is_up_to_date(name, digest):
+    """Whether every output of name exists and was rendered from DOT source with this SHA-1.
+
+    Icons are referenced by content hash, so the DOT source covers them as well.
+    """
+    cache_path = os.path.join(DOT_CACHE_DIR, f"{name}.sha1")
+    if not all(os.path.exists(f"{name}.{fmt}") for fmt in OUTFORMATS):
+        return False
+    if not os.path.exists(cache_path):
+        return False
+    with open(cache_path) as f:
+        return f.read().strip() == digest
+
+
+def render(stale):
+    """Render the (name, source, digest) diagrams by piping their DOT source into dot.
+
+    Each diagram gets its own dot process. Every source is written and its
+    stdin closed before any process is waited on, since dot reads all of its
+    input before laying out; the layouts then run concurrently. Every format in
+    OUTFORMATS is written straight to name.<fmt> with a -T<fmt> -o pair, so
+    dot parses and lays out each diagram once and no intermediate .gv file is
+    written.
+
+    All processes are waited on even if one fails. The DOT hash is cached for
+    each diagram whose dot succeeded, and the first failure is raised after.
+    """
+    processes = []
+    for name, source, _ in stale:
+        cmd = ["dot"]
+        for fmt in OUTFORMATS:
+            cmd += [f"-T{fmt}", "-o", f"{name}.{fmt}"]
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, text=True)
+        # If dot exits early, its return code reports the failure
+        with contextlib.suppress(BrokenPipeError):
+            try:
+                process.stdin.write(source)
+            finally:
+                process.stdin.close()
+        processes.append(process)
+
+    failures = []
+    for (name, _, digest), process in zip(stale, processes):
+        if process.wait() != 0:
+            failures.append(subprocess.CalledProcessError(process.returncode, process.args))
+            continue
+        os.makedirs(DOT_CACHE_DIR, exist_ok=True)
+        with open(os.path.join(DOT_CACHE_DIR, f"{name}.sha1"), "w") as f:
+            f.write(digest + "\n")
+    if failures:
+        raise failures[0]
+
+
+@functools.lru_cache(maxsize=None)
+def stage_once(path):
+    """Stage an image as ICON_CACHE_DIR/<sha1>.<ext> and return the staged path.
+
+    The file is hardlinked (copied when linking is not possible) the first time
+    its content is seen, so each distinct image has one stable path that does
+    not depend on where the source file is installed.
+    """
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    staged = os.path.join(ICON_CACHE_DIR, digest + os.path.splitext(path)[1])
+    if not os.path.exists(staged):
+        os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+        try:
+            os.link(path, staged)
+        except OSError:
+            shutil.copyfile(path, staged)
+    return staged
+
+
+@functools.lru_cache(maxsize=None)
+def aws_icon_dir():
+    """The diagrams package's resources/ directory, located on first use.
+
+    The package is only located, never imported: its AWS icons are plain PNG
+    files next to it.
+    """
+    spec = importlib.util.find_spec("diagrams")
+    if spec is None:
+        raise ImportError("the diagrams package provides the AWS icons: pip install -r requirements.txt")
+    return os.path.join(os.path.dirname(os.path.dirname(spec.origin)), "resources")
+
+
+@functools.lru_cache(maxsize=None)
+def icon_path(kind):
+    """Staged image file for a node kind; only the kinds a diagram uses are resolved."""
+    if kind in CUSTOM_ICONS:
+        return stage_once(CUSTOM_ICONS[kind])
+    return stage_once(os.path.join(aws_icon_dir(), AWS_ICONS[kind]))
+
+
+def quote(value):
+    """Quote a DOT ID, escaping backslashes, embedded quotes and newlines."""
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return '"' + escaped + '"'
+
+
+def attr_list(attrs):
+    """Format a mapping as a DOT attribute list."""
+    return "[" + " ".join(f"{key}={quote(value)}" for key, value in attrs.items()) + "]"
+
+
+# Attributes shared by every edge, formatted once
+EDGE_DEFAULTS = attr_list(EDGE_ATTRS)[1:-1]
+
+
+@functools.lru_cache(maxsize=None)
+def edge_attrs(label, color, line_style):
+    """Formatted DOT attribute list for an edge label, color and line style.
+
+    Rows that repeat a label and style share one formatted string.
+    """
+    return (
+        "["
+        + (f"label={quote(label)} " if label else "")
+        + (f'color="{color}" ' if color else "")
+        + (f'style="{line_style}" ' if line_style else "")
+        + f"{EDGE_DEFAULTS}]"
+    )
+
+
+def emit_nodes(body, depth, lines):
+    """Append the DOT lines for a tree of [nodeid, kind, label] nodes and clusters.
+
+    The tree is walked once: indentation and cluster background colour come
+    from the depth, and every statement is written exactly once. Icon nodes
+    get extra height for every additional label line.
+    """
+    indent = "\t" * (depth + 1)
+    for item in body:
+        if isinstance(item, dict):
+            bgcolor = CLUSTER_BGCOLORS[depth % len(CLUSTER_BGCOLORS)]
+            attrs = {**CLUSTER_ATTRS, "label": item["cluster"], "bgcolor": bgcolor}
+            lines.append(f"{indent}subgraph {quote('cluster_' + item['cluster'])} {{")
+            lines.append(f"{indent}\tgraph {attr_list(attrs)}")
+            emit_nodes(item["body"], depth + 1, lines)
+            lines.append(f"{indent}}}")
+        else:
+            nodeid, kind, label = item
+            height = 1.9 + 0.4 * label.count("\n")
+            lines.append(
+                f'{indent}{quote(nodeid)} [label={quote(label)} height="{height}" '
+                f'image={quote(icon_path(kind))} shape="none"]'
+            )
+
+
+def to_dot(spec):
+    """Generate the complete DOT source for a compiled diagram.
+
+    Edges are plain [src, dst, label, color, style] rows, emitted with one
+    join over a fixed per-row template and memoized attribute lists.
+    """
+    lines = [
+        f"digraph {quote(spec['title'])} {{",
+        f"\tgraph {attr_list({**GRAPH_ATTRS, 'label': spec['title'], 'rankdir': spec['direction']})}",
+        f"\tnode {attr_list(NODE_ATTRS)}",
+        f"\tedge {attr_list({'color': '#7B8894'})}",
+    ]
+    emit_nodes(spec["nodes"], 0, lines)
+    lines.append("\n".join(
+        f"\t{quote(src)} -> {quote(dst)} {edge_attrs(label, color, line_style)}"
+        for src, dst, label, color, line_style in spec["edges"]
+    ))
+    return "\n".join(lines + ["}"]) + "\n"
+
 
 if __name__ == "__main__":
-    print("Architecture diagrams generated successfully:")
-    print("- shopify-plugin-complete-architecture.png")
-    print("- oauth-flow-detailed-sequence.png") 
-    print("- shopify-api-operations.png")
+    os.chdir(SCRIPT_DIR)
+    stale = []
+    for spec in load_diagrams():
+        name = spec["name"]
+        source = to_dot(spec)
+        digest = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        if not is_up_to_date(name, digest):
+            stale.append((name, source, digest))
+
+    if stale:
+        render(stale)
+
+    sys.stdout.write(
+        "Architecture diagrams generated successfully:\n"
+        "- shopify-plugin-complete-architecture.png\n"
+        "- oauth-flow-detailed-sequence.png\n"
+        "- shopify-api-operations.png\n"
+    )